@@ -1,10 +1,33 @@
 import logging
+import sys
 from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from adles.group import Group
+
+
+@lru_cache(maxsize=4096)
+def _join_path(path, prefix, name):
+    """
+    Joins a deployment path with the name of the next Master folder.
+    Cached, as the same paths are recomputed for every folder instance.
+
+    :param str path: Current path
+    :param str prefix: Prefix of the Master folder
+    :param str name: Name to add to the path
+    :return: The joined path
+    :rtype: str
+    """
+    return f"{path}/{prefix}{name}"
 
 
 class Interface(ABC):
     """Base class for all Interfaces."""
 
+    __slots__ = ("_log", "infra", "spec", "metadata", "services", "networks",
+                 "folders", "thresholds", "groups", "_group_cache",
+                 "_net_type_index")
+
     # Names/prefixes
     master_prefix = "(MASTER) "
     master_root_name = "MASTER-FOLDERS"
@@ -18,11 +41,23 @@ class Interface(ABC):
         self.infra = infra      # Save the infrastructure configuration
         self.spec = spec        # Save the exercise specification
         self.metadata = spec["metadata"]    # Save the exercise spec metadata
-        self.services = spec["services"]
-        self.networks = spec["networks"]    # Networks for platforms
+        # Names are interned, as they're used as keys in many lookups
+        self.services = {sys.intern(name): config
+                         for name, config in spec["services"].items()}
+        self.networks = {   # Networks for platforms
+            net_type: {sys.intern(name): config
+                       for name, config in nets.items()}
+            for net_type, nets in spec["networks"].items()}
         self.folders = spec["folders"]
+        # Type of each network, keyed by network name
+        self._net_type_index = {}
+        for net_type, nets in self.networks.items():
+            for net_name in nets:
+                # The first type listing a network takes precedence
+                self._net_type_index.setdefault(net_name, net_type)
         self.thresholds = {}    # Thresholds for platforms
         self.groups = {}        # Groups for platforms
+        self._group_cache = {}  # Resolved groups, keyed by group name
 
     @abstractmethod
     def create_masters(self):
@@ -62,6 +97,39 @@ class Interface(ABC):
         :return: Number of instances, Prefix
         :rtype: tuple(int, str)
         """
+        num, prefix = self._parse_instances(spec)
+        if num is None:
+            self._log.error("Unknown instances specification: %s",
+                            spec["instances"])
+            num = 0
+
+        # Check if the number of instances exceeds
+        # the configured thresholds for the interface
+        thr = self.thresholds[obj_type]
+        if num > thr["error"]:
+            self._log.error("%d instances of %s '%s' is beyond the "
+                            "configured %s threshold of %d",
+                            num, obj_type, obj_name,
+                            self.__class__.__name__, thr["error"])
+            raise Exception("Threshold exceeded")
+        elif num > thr["warn"]:
+            self._log.warning("%d instances of %s '%s' is beyond the "
+                              "configured %s threshold of %d",
+                              num, obj_type, obj_name,
+                              self.__class__.__name__, thr["warn"])
+        return num, prefix
+
+    @staticmethod
+    def _parse_instances(spec):
+        """
+        Reads the number of instances and optional prefix from a
+        specification, without checking them against any thresholds.
+
+        :param dict spec: Dict of folder
+        :return: Number of instances (None if the instances specification
+        is unknown), Prefix
+        :rtype: tuple(int or None, str)
+        """
         num = 1
         prefix = ""
         if "instances" in spec:
@@ -78,24 +146,7 @@ class Interface(ABC):
                     # if num < 1:
                     num = 1  # WORKAROUND FOR AD-GROUPS
                 else:
-                    self._log.error("Unknown instances specification: %s",
-                                    str(spec["instances"]))
-                    num = 0
-
-        # Check if the number of instances exceeds
-        # the configured thresholds for the interface
-        thr = self.thresholds[obj_type]
-        if num > thr["error"]:
-            self._log.error("%d instances of %s '%s' is beyond the "
-                            "configured %s threshold of %d",
-                            num, obj_type, obj_name,
-                            self.__name__, thr["error"])
-            raise Exception("Threshold exceeded")
-        elif num > thr["warn"]:
-            self._log.warning("%d instances of %s '%s' is beyond the "
-                              "configured %s threshold of %d",
-                              num, obj_type, obj_name,
-                              self.__name__, thr["warn"])
+                    num = None
         return num, prefix
 
     def _path(self, path, name):
@@ -107,21 +158,19 @@ class Interface(ABC):
         :return: The updated path
         :rtype: str
         """
-        return str(path + '/' + self.master_prefix + name)
+        return _join_path(path, self.master_prefix, name)
 
     @staticmethod
     def _is_enabled(spec):
         """
         Determines if a spec is enabled.
+        The flags are normalized to booleans when the spec is ingested.
 
         :param dict spec: Specification to check
         :return: If the spec is enabled
         :rtype: bool
         """
-        if "enabled" in spec:
-            return bool(spec["enabled"])
-        else:
-            return True
+        return spec.get("enabled", True)
 
     def _determine_net_type(self, network_label):
         """
@@ -131,12 +180,12 @@ class Interface(ABC):
         :return: Type of the network ("generic-networks" | "unique-networks")
         :rtype: str
         """
-        for net_name, net_value in self.networks.items():
-            vals = {k for k in net_value}
-            if network_label in vals:
-                return net_name
-        self._log.error("Could not find type for network '%s'", network_label)
-        return ""
+        net_type = self._net_type_index.get(network_label)
+        if net_type is None:
+            self._log.error("Could not find type for network '%s'",
+                            network_label)
+            return ""
+        return net_type
 
     def _get_group(self, group_name):
         """
@@ -147,16 +196,19 @@ class Interface(ABC):
         :return: Group object
         :rtype: :class:`Group`
         """
-        from adles.group import Group
+        if group_name in self._group_cache:
+            return self._group_cache[group_name]
         if group_name in self.groups:
             group = self.groups[group_name]
             if isinstance(group, Group):    # Normal groups
+                self._group_cache[group_name] = group
                 return group
             elif isinstance(group, list):   # Template groups
+                self._group_cache[group_name] = group[0]
                 return group[0]
             else:
                 self._log.error("Unknown type for group '%s': %s",
-                                str(group_name), str(type(group)))
+                                group_name, type(group))
         else:
             self._log.error("Could not get group '%s' from groups", group_name)
 
@@ -166,7 +218,7 @@ class Interface(ABC):
                                str(self.infra))
 
     def __str__(self):
-        return str([x for x in self.infra.keys()])
+        return str(list(self.infra))
 
     def __hash__(self):
         return hash(str(self))
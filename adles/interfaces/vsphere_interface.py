@@ -1,18 +1,68 @@
 import logging
 import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from threading import BoundedSemaphore, Lock
 
+from pyVmomi import vim
+
+from adles.group import Group, get_ad_groups
 from adles.interfaces import Interface
-from adles.utils import get_vlan, pad, read_json
+from adles.utils import pad, read_json
 from adles.vsphere import Vsphere
 from adles.vsphere.folder_utils import format_structure
 from adles.vsphere.network_utils import create_portgroup
-from adles.vsphere.vm import VM
-from adles.vsphere.vsphere_utils import VsphereException, is_folder, is_vm
+from adles.vsphere.vm import VM, nic_add_spec, nic_edit_spec, nic_remove_spec
+from adles.vsphere.vsphere_utils import VsphereException
+
+
+def _load_login(filename):
+    """
+    Reads a login file, reusing the parsed result if the file is unchanged.
+
+    :param str filename: Path to the JSON login file
+    :return: Contents of the login file
+    :rtype: dict or None
+    """
+    try:
+        mtime = os.stat(filename).st_mtime
+    except OSError:
+        return read_json(filename)  # Let read_json log the problem
+    return _read_login(filename, mtime)
+
+
+@lru_cache(maxsize=8)
+def _read_login(filename, mtime):
+    """
+    Cached read of a login file. The modification time is part of the key,
+    so a changed file is re-read instead of hitting a stale entry.
+
+    :param str filename: Path to the JSON login file
+    :param float mtime: Modification time of the file
+    :return: Contents of the login file
+    :rtype: dict or None
+    """
+    return read_json(filename)
 
 
 class VsphereInterface(Interface):
     """Generic interface for the VMware vSphere platform."""
 
+    __slots__ = ("server", "host", "hosts", "server_root", "root_folder",
+                 "root_path", "root_name", "master_folder", "template_folder",
+                 "vswitch_name", "masters", "net_table",
+                 "max_parallel_clones", "max_clones_per_host",
+                 "_template_map", "_net_cache", "_network_cache",
+                 "_vsphere_services", "_vlan_map", "_generic_vswitch",
+                 "_host_limits", "_host_limits_lock", "_resource_pool",
+                 "_clone_spec", "_str_cache")
+
+    # Keys of a parent-type folder that are configuration, not sub-folders
+    _PARENT_SKIP_KEYS = frozenset({"instances", "description",
+                                   "enabled", "master-group"})
+
     def __init__(self, infra, spec):
         """
         .. warning:: The infrastructure and spec are assumed to be valid,
@@ -25,11 +75,23 @@ class VsphereInterface(Interface):
         super(VsphereInterface, self).__init__(infra=infra, spec=spec)
         self._log = logging.getLogger(str(self.__class__))
         self._log.debug("Initializing %s", self.__class__)
+
         self.master_folder = None
         self.template_folder = None
-        # Used to do lookups of Generic networks during deployment
-        self.net_table = {}
-        # Cache containing Master instances (TODO: potential naming conflicts)
+        self._str_cache = None  # Cached result of __str__
+        # Templates in the template folder, keyed by lowercase name
+        self._template_map = {}
+        # Names of the networks known to exist, used to do lookups
+        # of Generic networks during deployment
+        self.net_table = set()
+        # Resolved network names, keyed by (network name, instance)
+        self._net_cache = {}
+        # Names of the services that are vSphere services
+        self._vsphere_services = frozenset(
+            name for name, config in self.services.items()
+            if isinstance(config, dict) and "template" in config)
+        # Cache containing Master templates, keyed by name
+        # (TODO: potential naming conflicts)
         self.masters = {}
 
         if "thresholds" in infra:
@@ -44,9 +106,30 @@ class VsphereInterface(Interface):
                     "error": 70}
             }
 
+        # VLAN tags for the portgroups created by this interface,
+        # keyed by (network name, instance). Assigned by _init_vlans()
+        # in the phases that create portgroups.
+        self._vlan_map = {}
+
+        # Maximum number of VMs to clone concurrently
+        self.max_parallel_clones = int(infra.get("max-parallel-clones", 4))
+        # Maximum number of VMs to clone concurrently on a single ESXi host
+        self.max_clones_per_host = int(infra.get("max-clones-per-host",
+                                                 self.max_parallel_clones))
+        # A limit of 0 would deadlock or crash cloning halfway through
+        if self.max_parallel_clones < 1 or self.max_clones_per_host < 1:
+            raise VsphereException("max-parallel-clones and "
+                                   "max-clones-per-host must be at least 1")
+        self._host_limits = {}
+        self._host_limits_lock = Lock()
+        # Resource pool and clone specification shared by all the clones
+        # in a phase, set by _prepare_clones()
+        self._resource_pool = None
+        self._clone_spec = None
+
         # Read infrastructure login information
         if "login-file" in infra:
-            logins = read_json(infra["login-file"])
+            logins = _load_login(infra["login-file"])
         else:
             self._log.warning("No login-file specified, "
                               "defaulting to user prompts...")
@@ -62,10 +145,9 @@ class VsphereInterface(Interface):
 
         # Acquire ESXi hosts
         if "hosts" in infra:
-            hosts = infra["hosts"]
-            self.host = self.server.get_host(hosts[0])
             # Gather all the ESXi hosts
-            self.hosts = [self.server.get_host(h) for h in hosts]
+            self.hosts = self.server.get_hosts(infra["hosts"])
+            self.host = self.hosts[0]
         else:
             self.host = self.server.get_host()  # First host found in Datacenter
 
@@ -108,8 +190,20 @@ class VsphereInterface(Interface):
         if "vswitch" in infra:
             self.vswitch_name = infra["vswitch"]
         else:
-            from pyVmomi import vim
             self.vswitch_name = self.server.get_item(vim.Network).name
+        # vSwitch to create each generic network's portgroups on
+        self._generic_vswitch = {
+            name: config.get("vswitch", self.vswitch_name)
+            for name, config in self.networks.get("generic-networks",
+                                                  {}).items()}
+
+        # Cache of networks that exist, keyed by lowercase name
+        # Pre-populated with all networks in the datacenter in one call
+        networks = self.server.get_properties(
+            self.server.datacenter.networkFolder, [vim.Network], ["name"])
+        self._network_cache = {props["name"].lower(): net
+                               for net, props in networks.items()}
+        self.net_table.update(props["name"] for props in networks.values())
 
         self._log.debug("Finished initializing VsphereInterface")
 
@@ -120,11 +214,11 @@ class VsphereInterface(Interface):
         :return: Initialized Groups
         :rtype: dict(:class:`Group`)
         """
-        from adles.group import Group, get_ad_groups
         groups = {}
 
         # Instantiate Groups
         for name, config in self.spec["groups"].items():
+            name = sys.intern(name)
             if "instances" in config:  # Template groups
                 groups[name] = [Group(name, config, i)
                                 for i in range(1, config["instances"] + 1)]
@@ -142,22 +236,72 @@ class VsphereInterface(Interface):
                     # Reference: pyvmomi/docs/vim/UserSearchResult.rst
                     if result.group is True:
                         self._log.error("Result '%s' is not a user",
-                                        str(result))
+                                        result)
                     else:
                         group.users.append(result.principal)
                 # Set the size, default to 1
                 group.size = (len(group.users) if len(group.users) > 1 else 1)
             else:
                 self._log.error("Could not initialize AD-group %s",
-                                str(group.ad_group))
+                                group.ad_group)
 
-        if hasattr(self.server.user_dir, "domainList"):
+        # Only query the server for its domains if they'll be logged
+        if self._log.isEnabledFor(logging.DEBUG) and \
+                hasattr(self.server.user_dir, "domainList"):
             self._log.debug("Domains on server: %s",
-                            str(self.server.user_dir.domainList))
+                            self.server.user_dir.domainList)
         return groups
 
+    def _init_vlans(self):
+        """
+        Assigns VLAN tags to every portgroup this interface could create.
+        Each network gets a tag for its Master portgroup, and each
+        generic network gets one per instance of the base-type folder
+        with the most instances.
+
+        :return: VLAN tags, keyed by (network name, instance)
+        :rtype: dict
+        """
+        keys = [(name, -1) for nets in self.networks.values()
+                for name, config in nets.items() if "vlan" not in config]
+        num_instances = self._max_base_folder_instances()
+        for name in self.networks.get("generic-networks", {}):
+            keys.extend((name, i) for i in range(num_instances))
+
+        vlans = range(2000, 4096)
+        if len(keys) > len(vlans):
+            raise VsphereException("%d portgroups need VLAN tags, but only "
+                                   "%d are available" % (len(keys), len(vlans)))
+        return dict(zip(keys, vlans))
+
+    def _max_base_folder_instances(self):
+        """
+        Finds the largest number of instances of any enabled
+        base-type folder in the specification.
+
+        :return: Number of instances
+        :rtype: int
+        """
+        most = 0
+        pending = [self.folders]
+        while pending:
+            folder = pending.pop()
+            for sub_name, sub_value in folder.items():
+                if sub_name in self._PARENT_SKIP_KEYS or \
+                        not isinstance(sub_value, dict) or \
+                        not self._is_enabled(sub_value):
+                    continue
+                if "services" in sub_value:  # It's a base folder
+                    # Thresholds are enforced when the folder is deployed
+                    num_instances, _ = self._parse_instances(sub_value)
+                    most = max(most, num_instances or 0)
+                else:  # It's a parent folder
+                    pending.append(sub_value)
+        return most
+
     def create_masters(self):
         """ Exercise Environment Master creation phase. """
+        self._vlan_map = self._init_vlans()
 
         # Get folder containing templates
         self.template_folder = self.server_root.traverse_path(
@@ -170,10 +314,17 @@ class VsphereInterface(Interface):
             self._log.debug("Found template folder: '%s'",
                             self.template_folder.name)
 
+        # Map the templates in the folder to their names in a single call
+        templates = self.server.get_properties(self.template_folder,
+                                               [vim.VirtualMachine], ["name"],
+                                               recursive=False)
+        self._template_map = {props["name"].lower(): template
+                              for template, props in templates.items()}
+
+        self._prepare_clones()
+
         # Create master folder to hold base service instances
-        self.master_folder = self.root_folder.traverse_path(
-            self.master_root_name)
-        if not self.master_folder:
+        if not self._get_master_folder():
             self.master_folder = self.server.create_folder(
                 self.master_root_name, self.root_folder)
             self._log.info("Created Master folder '%s' in '%s'",
@@ -188,7 +339,9 @@ class VsphereInterface(Interface):
         self._master_parent_folder_gen(self.folders, self.master_folder)
 
         # Output fully deployed master folder tree to debugging
-        self._log.debug(format_structure(self.root_folder.enumerate()))
+        # (enumerating the tree reads every item from the server)
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug(format_structure(self.root_folder.enumerate()))
 
     def _master_parent_folder_gen(self, folder, parent):
         """
@@ -198,44 +351,48 @@ class VsphereInterface(Interface):
         :param parent: Parent folder
         :type parent: vim.Folder
         """
-        skip_keys = ["instances", "description", "enabled"]
         if not self._is_enabled(folder):  # Check if disabled
             self._log.warning("Skipping disabled parent-type folder %s",
                               parent.name)
             return
 
-        # We have to check every item, as they could be keywords or sub-folders
-        for sub_name, sub_value in folder.items():
-            if sub_name in skip_keys:
-                # Skip configurations that are not relevant
-                continue
-            elif sub_name == "group":
-                pass  # group = self._get_group(sub_value)
-            elif sub_name == "master-group":
-                pass  # master_group = self._get_group(sub_value)
-            else:
-                folder_name = self.master_prefix + sub_name
-                new_folder = self.server.create_folder(folder_name,
-                                                       create_in=parent)
+        # Walk the folder tree breadth-first using a queue of
+        # (folder spec, parent folder) pairs instead of recursing
+        queue = deque([(folder, parent)])
+        while queue:
+            folder, parent = queue.popleft()
+
+            # We have to check every item,
+            # as they could be keywords or sub-folders
+            for sub_name, sub_value in folder.items():
+                if sub_name in self._PARENT_SKIP_KEYS:
+                    # Skip configurations that are not relevant
+                    continue
+                elif sub_name == "group":
+                    pass  # group = self._get_group(sub_value)
+                else:
+                    folder_name = self.master_prefix + sub_name
+                    new_folder = self.server.create_folder(folder_name,
+                                                           create_in=parent)
 
-                if "services" in sub_value:  # It's a base folder
-                    if self._is_enabled(sub_value):
-                        self._log.info("Generating Master base-type folder %s",
-                                       sub_name)
-                        self._master_base_folder_gen(sub_name, sub_value,
-                                                     new_folder)
-                    else:
-                        self._log.warning("Skipping disabled "
-                                          "base-type folder %s", sub_name)
-                else:  # It's a parent folder, recurse
-                    if self._is_enabled(sub_value):
-                        self._master_parent_folder_gen(sub_value,
-                                                       parent=new_folder)
-                        self._log.info("Generating Master "
-                                       "parent-type folder %s", sub_name)
-                    else:
-                        self._log.warning("Skipping disabled "
-                                          "parent-type folder %s", sub_name)
+                    if "services" in sub_value:  # It's a base folder
+                        if self._is_enabled(sub_value):
+                            self._log.info("Generating Master "
+                                           "base-type folder %s", sub_name)
+                            self._master_base_folder_gen(sub_name, sub_value,
+                                                         new_folder)
+                        else:
+                            self._log.warning("Skipping disabled "
+                                              "base-type folder %s", sub_name)
+                    else:  # It's a parent folder, queue it up
+                        if self._is_enabled(sub_value):
+                            self._log.info("Generating Master "
+                                           "parent-type folder %s", sub_name)
+                            queue.append((sub_value, new_folder))
+                        else:
+                            self._log.warning("Skipping disabled "
+                                              "parent-type folder %s",
+                                              sub_name)
 
     def _master_base_folder_gen(self, folder_name, folder_dict, parent):
         """
@@ -252,21 +409,49 @@ class VsphereInterface(Interface):
         # else:
         #     master_group = self._get_group(folder_dict["group"])
 
-        # Create Master instances
+        # Entries that share a service share the same Master VM, so group
+        # them to be created and configured in order by a single worker
+        entries = {}
         for sname, sconfig in folder_dict["services"].items():
-            if not self._is_vsphere(sconfig["service"]):
+            if sconfig["service"] not in self._vsphere_services:
+                self._validate_service(sconfig["service"])
                 self._log.debug("Skipping non-vsphere service '%s'", sname)
                 continue
+            entries.setdefault(sconfig["service"], []).append(
+                (sname, sconfig["networks"]))
+
+        # Create Master instances, cloning up to
+        # max_parallel_clones services at a time
+        with ThreadPoolExecutor(max_workers=self.max_parallel_clones) as pool:
+            futures = [pool.submit(self._create_service_entries, parent,
+                                   service_name, service_entries)
+                       for service_name, service_entries in entries.items()]
+
+            for future in as_completed(futures):
+                for sname in future.result():
+                    self._log.error("Failed to create Master instance '%s' "
+                                    "in folder '%s'", sname, folder_name)
+
+    def _create_service_entries(self, folder, service_name, entries):
+        """
+        Creates the Master for a service, applying the configuration of
+        every folder entry that uses the service in order.
 
-            self._log.info("Creating Master instance '%s' from service '%s'",
-                           sname, sconfig["service"])
-
-            vm = self._create_service(parent, sconfig["service"],
-                                      sconfig["networks"])
-            if vm is None:
-                self._log.error("Failed to create Master instance '%s' "
-                                "in folder '%s'", sname, folder_name)
-                continue  # Skip to the next service
+        :param folder: Folder to create service in
+        :type folder: vim.Folder
+        :param str service_name: Name of the service to clone
+        :param entries: Names and networks of the entries using the service
+        :type entries: list(tuple(str, list))
+        :return: Names of the entries that failed
+        :rtype: list(str)
+        """
+        failed = []
+        for sname, networks in entries:
+            self._log.info("Creating Master instance '%s' "
+                           "from service '%s'", sname, service_name)
+            if self._create_service(folder, service_name, networks) is None:
+                failed.append(sname)
+        return failed
 
     def _create_service(self, folder, service_name, networks):
         """
@@ -289,16 +474,16 @@ class VsphereInterface(Interface):
         test = folder.traverse_path(vm_name)  # Check service already exists
         if test is None:
             # Find the template that matches the service definition
-            template = self.template_folder.traverse_path(config["template"])
+            template = self._get_template(config["template"])
             if not template:
                 self._log.error("Could not find template '%s' for service '%s'",
                                 config["template"], service_name)
                 return None
             self._log.info("Creating service '%s'", service_name)
             vm = VM(name=vm_name, folder=folder,
-                    resource_pool=self.server.get_pool(),
+                    resource_pool=self._resource_pool,
                     datastore=self.server.datastore, host=self.host)
-            if not vm.create(template=template):
+            if not self._clone_vm(vm, template):
                 return None
         else:
             self._log.warning("Service %s already exists", service_name)
@@ -325,6 +510,32 @@ class VsphereInterface(Interface):
                            self.metadata["name"])
         return vm
 
+    def _get_template(self, path):
+        """
+        Finds a template in the template folder.
+
+        :param str path: Name of the template, or path to it
+        relative to the template folder
+        :return: The template found
+        :rtype: vim.VirtualMachine or None
+        """
+        if '/' in path:  # Paths into sub-folders aren't in the map
+            return self.template_folder.traverse_path(path)
+        return self._template_map.get(path.lower())
+
+    def _get_master_folder(self):
+        """
+        Finds the folder containing the Masters, reusing the folder
+        found by a previous call.
+
+        :return: The Master folder
+        :rtype: vim.Folder or None
+        """
+        if self.master_folder is None:
+            self.master_folder = self.root_folder.find_in(
+                self.master_root_name)
+        return self.master_folder
+
     def _create_master_networks(self, net_type, default_create):
         """
         Creates a network as part of the Master creation phase.
@@ -337,10 +548,13 @@ class VsphereInterface(Interface):
         # Pick up any recent changes to the host's network status
         self.host.configManager.networkSystem.RefreshNetworkSystem()
         self._log.info("Creating %s", net_type)
+        # Lowercase names of the portgroups on the host, fetched in a
+        # single call (lookups of networks are case-insensitive)
+        existing = {pg.spec.name.lower()
+                    for pg in self.host.config.network.portgroup}
 
         for name, config in self.networks[net_type].items():
-            exists = self.server.get_network(name)
-            if exists:
+            if name.lower() in existing:
                 self._log.info("PortGroup '%s' already exists on host '%s'",
                                name, self.host.name)
             else:  # NOTE: if monitoring, we want promiscuous=True
@@ -351,10 +565,29 @@ class VsphereInterface(Interface):
                                    name, self.host.name)
                     create_portgroup(name=name, host=self.host,
                                      promiscuous=False,
-                                     vlan=int(config.get("vlan",
-                                                         next(get_vlan()))),
+                                     vlan=(int(config["vlan"])
+                                           if "vlan" in config
+                                           else self._vlan_map[(name, -1)]),
                                      vswitch_name=config.get("vswitch",
                                                              self.vswitch_name))
+                    existing.add(name.lower())
+
+    def _get_network(self, name):
+        """
+        Finds a network, using the cache of known networks
+        before searching the server.
+
+        :param str name: Name of the network
+        :return: The network found
+        :rtype: vim.Network or None
+        """
+        key = name.lower()
+        network = self._network_cache.get(key)
+        if network is None:
+            network = self.server.get_network(name)
+            if network is not None:
+                self._network_cache[key] = network
+        return network
 
     def _configure_nics(self, vm, networks, instance=None):
         """
@@ -368,9 +601,14 @@ class VsphereInterface(Interface):
         for Deployment purposes
         """
         self._log.info("Editing NICs for VM '%s'", vm.name)
-        num_nics = len(list(vm.network))
+        if instance is not None:
+            # Resolve generic networks for deployment phase
+            networks = [self._get_net(net_name, instance)
+                        for net_name in networks]
+        nics = vm.get_nics()  # Fetch the VM's devices once
+        num_nics = len(nics)
         num_nets = len(networks)
-        nets = networks  # Copy the passed variable so we can edit it later
+        specs = []  # All NIC changes are applied in a single reconfiguration
 
         # Ensure number of NICs on VM
         # matches number of networks configured for the service
@@ -381,40 +619,39 @@ class VsphereInterface(Interface):
             diff = int(num_nics - num_nets)
             self._log.debug("VM '%s' has %d extra NICs, removing...",
                             vm.name, diff)
-            for _, nic in enumerate(reversed(range(num_nics)), start=1):
-                vm.remove_nic(nic)
+            specs.extend(nic_remove_spec(nic) for nic in nics[num_nets:])
         elif num_nics < num_nets:   # Create missing interfaces
             diff = int(num_nets - num_nics)
             self._log.debug("VM '%s' is deficient %d NICs, adding...",
                             vm.name, diff)
-            # Add NICs to VM and pop them from the list of networks
-            for _ in range(diff):
-                # Select NIC hardware
-                nic_model = ("vmxnet3" if vm.has_tools() else "e1000")
-                net_name = nets.pop()
-                vm.add_nic(network=self.server.get_network(net_name),
-                           model=nic_model, summary=net_name)
-
-        # Edit the interfaces
-        # (NOTE: any NICs added earlier shouldn't be affected by this)
-        for i, net_name in enumerate(networks, start=1):
+            # Select NIC hardware (Tools state can't change in the loop)
+            nic_model = ("vmxnet3" if vm.has_tools() else "e1000")
+            # Add NICs for the networks beyond the VM's existing NICs
+            for net_name in networks[num_nics:]:
+                specs.append(nic_add_spec(network=self._get_network(net_name),
+                                          model=nic_model, summary=net_name))
+
+        # Edit the existing interfaces
+        # (NOTE: any NICs added above aren't affected by this)
+        for i, net_name in enumerate(networks[:num_nics], start=1):
             # Setting the summary to network name
             # allows viewing of name without requiring
             # read permissions to the network itself
-            if instance is not None:
-                # Resolve generic networks for deployment phase
-                net_name = self._get_net(net_name, instance)
-            network = self.server.get_network(net_name)
-            if vm.get_nic_by_id(i).backing.network == network:
+            network = self._get_network(net_name)
+            nic = nics[i - 1]
+            if nic.backing.network == network:
                 continue  # Skip NICs that are already configured
             else:
-                vm.edit_nic(nic_id=i, network=network, summary=net_name)
+                specs.append(nic_edit_spec(nic, network=network,
+                                           summary=net_name))
+
+        if specs:
+            vm.reconfig_nics(specs)
 
     def deploy_environment(self):
         """ Exercise Environment deployment phase """
-        self.master_folder = self.root_folder.traverse_path(
-            self.master_root_name)
-        if self.master_folder is None:  # Check if Master folder was found
+        self._vlan_map = self._init_vlans()
+        if self._get_master_folder() is None:  # Check if Master was found
             self._log.error("Could not find Master folder '%s'. "
                             "Please ensure the  Master Creation phase "
                             "has been run and the folder exists "
@@ -424,6 +661,8 @@ class VsphereInterface(Interface):
         self._log.debug("Master folder name: %s\tPrefix: %s",
                         self.master_folder.name, self.master_prefix)
 
+        self._prepare_clones()
+
         # Verify and convert Master instances to templates
         self._log.info("Validating and converting Masters to Templates")
         self._convert_and_verify(folder=self.master_folder)
@@ -437,7 +676,9 @@ class VsphereInterface(Interface):
         self._log.info("Finished deploying environment")
 
         # Output fully deployed environment tree to debugging
-        self._log.debug(format_structure(self.root_folder.enumerate()))
+        # (enumerating the tree reads every item from the server)
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug(format_structure(self.root_folder.enumerate()))
 
     def _convert_and_verify(self, folder):
         """
@@ -449,38 +690,37 @@ class VsphereInterface(Interface):
         """
         self._log.debug("Converting Masters in folder '%s' to templates",
                         folder.name)
-        for item in folder.childEntity:
-            if is_vm(item):
-                vm = VM(vm=item)
-                self.masters[vm.name] = vm
-                if vm.is_template():
-                    # Skip if they already exist from a previous run
-                    self._log.debug("Master '%s' is already a template",
-                                    vm.name)
-                    continue
-
-                # Cleanly power off VM before converting to template
-                if vm.powered_on():
-                    vm.change_state("off", attempt_guest=True)
-
-                # Take a snapshot to allow reverts to the start of the exercise
-                vm.create_snapshot("Start of exercise",
-                                   "Beginning of deployment phase, "
-                                   "post-master configuration")
+        # Retrieve the state of every Master in the folder tree at once,
+        # instead of querying the server for each VM and folder
+        masters = self.server.get_properties(
+            folder, [vim.VirtualMachine],
+            ["name", "config.template", "runtime.powerState"])
+        for item, props in masters.items():
+            name = props["name"]
+            self.masters[name] = item
+            if props.get("config.template"):
+                # Skip if they already exist from a previous run
+                self._log.debug("Master '%s' is already a template", name)
+                continue
 
-                # Convert Master instance to Template
-                vm.convert_template()
-                if not vm.is_template():
-                    self._log.error("Master '%s' did not convert to Template",
-                                    vm.name)
-                else:
-                    self._log.debug("Converted Master '%s' to Template",
-                                    vm.name)
-            elif is_folder(item):  # Recurse into sub-folders
-                self._convert_and_verify(item)
+            vm = VM(vm=item)
+            # Cleanly power off VM before converting to template
+            if props.get("runtime.powerState") == \
+                    vim.VirtualMachine.PowerState.poweredOn:
+                vm.change_state("off", attempt_guest=True)
+
+            # Take a snapshot to allow reverts to the start of the exercise
+            vm.create_snapshot("Start of exercise",
+                               "Beginning of deployment phase, "
+                               "post-master configuration")
+
+            # Convert Master instance to Template
+            vm.convert_template()
+            if not vm.is_template():
+                self._log.error("Master '%s' did not convert to Template",
+                                name)
             else:
-                self._log.debug("Unknown item found while "
-                                "templatizing Masters: %s", str(item))
+                self._log.debug("Converted Master '%s' to Template", name)
 
     def _deploy_parent_folder_gen(self, spec, parent, path):
         """
@@ -491,14 +731,35 @@ class VsphereInterface(Interface):
         :type parent: vim.Folder
         :param str path: Folders path at the current level
         """
-        skip_keys = ["instances", "description", "master-group", "enabled"]
         if not self._is_enabled(spec):  # Check if disabled
             self._log.warning("Skipping disabled parent-type folder %s",
                               parent.name)
             return
 
+        # Walk the folder tree breadth-first using a queue of
+        # (folder spec, parent folder, path) tuples instead of recursing
+        queue = deque([(spec, parent, path)])
+        with ThreadPoolExecutor(max_workers=self.max_parallel_clones) \
+                as executor:
+            while queue:
+                spec, parent, path = queue.popleft()
+                self._deploy_parent_folder_items(spec, parent, path,
+                                                 queue, executor)
+
+    def _deploy_parent_folder_items(self, spec, parent, path, queue, executor):
+        """
+        Deploys the items of a single parent-type folder.
+
+        :param dict spec: Dict with folder specification
+        :param parent: Parent folder
+        :type parent: vim.Folder
+        :param str path: Folders path at the current level
+        :param deque queue: Queue of parent-type folders left to deploy
+        :param executor: Executor used to create sibling folders
+        :type executor: ThreadPoolExecutor
+        """
         for sub_name, sub_value in spec.items():
-            if sub_name in skip_keys:
+            if sub_name in self._PARENT_SKIP_KEYS:
                 # Skip configurations that are not relevant
                 continue
             elif sub_name == "group":  # Configure group
@@ -508,39 +769,39 @@ class VsphereInterface(Interface):
                 num_instances, prefix = self._instances_handler(spec,
                                                                 sub_name,
                                                                 "folder")
-                for i in range(num_instances):
-                    # If prefix is undefined or there's a single instance,
-                    # use the folder's name
-                    instance_name = (sub_name
-                                     if prefix == "" or num_instances == 1
-                                     else prefix)
-
-                    # If multiple instances, append padded instance number
-                    instance_name += (pad(i) if num_instances > 1 else "")
+                # If prefix is undefined or there's a single instance,
+                # use the folder's name
+                base_name = (sub_name if prefix == "" or num_instances == 1
+                             else prefix)
+                # If multiple instances, append padded instance number
+                names = [base_name + (pad(i) if num_instances > 1 else "")
+                         for i in range(num_instances)]
 
-                    # Create a folder for the instance
-                    new_folder = self.server.create_folder(instance_name,
-                                                           create_in=parent)
+                # Create the folders for the instances concurrently
+                new_folders = executor.map(
+                    lambda name: self.server.create_folder(
+                        name, create_in=parent), names)
 
+                for new_folder in new_folders:
                     if "services" in sub_value:  # It's a base folder
                         if self._is_enabled(sub_value):
-                            self._deploy_base_folder_gen(folder_name=sub_name,
-                                                         folder_items=sub_value,
-                                                         parent=new_folder,
-                                                         path=self._path(
-                                                             path, sub_name))
+                            self._deploy_base_folder_gen(
+                                folder_name=sub_name,
+                                folder_items=sub_value,
+                                parent=new_folder,
+                                path=self._path(path, sub_name))
                         else:
                             self._log.warning("Skipping disabled "
-                                              "base-type folder %s", sub_name)
-                    else:  # It's a parent folder
+                                              "base-type folder %s",
+                                              sub_name)
+                    else:  # It's a parent folder, queue it up
                         if self._is_enabled(sub_value):
-                            self._deploy_parent_folder_gen(parent=new_folder,
-                                                           spec=sub_value,
-                                                           path=self._path(
-                                                               path, sub_name))
+                            queue.append((sub_value, new_folder,
+                                          self._path(path, sub_name)))
                         else:
                             self._log.warning("Skipping disabled "
-                                              "parent-type folder %s", sub_name)
+                                              "parent-type folder %s",
+                                              sub_name)
 
     def _deploy_base_folder_gen(self, folder_name, folder_items, parent, path):
         """
@@ -595,43 +856,89 @@ class VsphereInterface(Interface):
         :param str path: Folders path at the current level
         :param int instance: What instance of a base folder this is
         """
-        # Iterate through the services
-        for service_name, value in services.items():
-            if not self._is_vsphere(value["service"]):
-                # Ignore non-vsphere services
-                self._log.debug("Skipping non-vsphere service '%s'",
-                                service_name)
-                continue
-            self._log.info("Generating service '%s' in folder '%s'",
-                           service_name, parent.name)
-
-            # Check if number of instances for service exceeds configured limits
-            num_instances, prefix = self._instances_handler(value,
-                                                            service_name,
-                                                            "service")
-
-            # Get the Master template instance to clone from
-            master = self.masters.get(self.master_prefix + value["service"],
-                                      None)
-            if master is None:  # Check if the lookup was successful
-                self._log.error("Couldn't find Master for service '%s' "
-                                "in this path:\n%s", value["service"], path)
-                continue  # Skip to the next service
-
-            # Clone the instances of the service from the master
-            for i in range(num_instances):
-                instance_name = prefix + service_name + (" " + pad(i)
-                                                         if num_instances > 1
-                                                         else "")
-                vm = VM(name=instance_name, folder=parent,
-                        resource_pool=self.server.get_pool(),
-                        datastore=self.server.datastore, host=self.host)
-                if not vm.create(template=master.get_vim_vm()):
-                    self._log.error("Failed to create instance %s",
-                                    instance_name)
+        with ThreadPoolExecutor(max_workers=self.max_parallel_clones) as pool:
+            clones = {}
+            # Iterate through the services
+            for service_name, value in services.items():
+                if value["service"] not in self._vsphere_services:
+                    # Ignore non-vsphere services
+                    self._validate_service(value["service"])
+                    self._log.debug("Skipping non-vsphere service '%s'",
+                                    service_name)
+                    continue
+                self._log.info("Generating service '%s' in folder '%s'",
+                               service_name, parent.name)
+
+                # Check if number of instances for service exceeds limits
+                num_instances, prefix = self._instances_handler(value,
+                                                                service_name,
+                                                                "service")
+
+                # Get the Master template instance to clone from
+                master = self.masters.get(
+                    self.master_prefix + value["service"], None)
+                if master is None:  # Check if the lookup was successful
+                    self._log.error("Couldn't find Master for service '%s' "
+                                    "in this path:\n%s",
+                                    value["service"], path)
+                    continue  # Skip to the next service
+
+                # Clone the instances of the service from the master
+                for i in range(num_instances):
+                    instance_name = prefix + service_name + (
+                        " " + pad(i) if num_instances > 1 else "")
+                    vm = VM(name=instance_name, folder=parent,
+                            resource_pool=self._resource_pool,
+                            datastore=self.server.datastore, host=self.host)
+                    future = pool.submit(self._clone_vm, vm, master)
+                    clones[future] = (vm, value["networks"])
+
+            # Configure the clones as they finish
+            for future in as_completed(clones):
+                vm, networks = clones[future]
+                if not future.result():
+                    self._log.error("Failed to create instance %s", vm.name)
                 else:
-                    self._configure_nics(vm, value["networks"],
-                                         instance=instance)
+                    self._configure_nics(vm, networks, instance=instance)
+
+    def _prepare_clones(self):
+        """
+        Looks up the resource pool and builds the clone specification
+        once, so they can be reused for every clone in a phase.
+        """
+        self._resource_pool = self.server.get_pool()
+        self._clone_spec = vim.vm.CloneSpec(location=vim.vm.RelocateSpec(
+            pool=self._resource_pool, datastore=self.server.datastore))
+
+    def _clone_vm(self, vm, template):
+        """
+        Clones a template into a VM, limiting the number of
+        concurrent clones on the VM's host.
+
+        :param vm: VM to create
+        :type vm: :class:`VM`
+        :param template: Template to clone
+        :type template: vim.VirtualMachine
+        :return: If the clone was successful
+        :rtype: bool
+        """
+        with self._host_limit(vm.host):
+            return vm.create(template=template, clone_spec=self._clone_spec)
+
+    def _host_limit(self, host):
+        """
+        Gets the semaphore limiting concurrent clones on a host.
+
+        :param host: The host
+        :type host: vim.HostSystem
+        :return: The host's clone semaphore
+        :rtype: threading.BoundedSemaphore
+        """
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = BoundedSemaphore(
+                    self.max_clones_per_host)
+            return self._host_limits[host]
 
     def _is_vsphere(self, service_name):
         """
@@ -642,12 +949,22 @@ class VsphereInterface(Interface):
         :return: If a service is a vSphere-type service
         :rtype: bool
         """
+        return service_name in self._vsphere_services
+
+    def _validate_service(self, service_name):
+        """
+        Checks that a service is defined in the specification.
+
+        :param str service_name: Name of the service to lookup in
+        list of defined services
+        :return: If the service is defined
+        :rtype: bool
+        """
         if service_name not in self.services:
             self._log.error("Could not find service %s in list of services",
                             service_name)
-        elif "template" in self.services[service_name]:
-            return True
-        return False
+            return False
+        return True
 
     def _get_net(self, name, instance=-1):
         """
@@ -662,37 +979,51 @@ class VsphereInterface(Interface):
         :return: Resolved network name
         :rtype: str
         """
+        name = sys.intern(name)
+        key = (name, instance)
+        if key in self._net_cache:
+            return self._net_cache[key]
         net_type = self._determine_net_type(name)
         if net_type == "unique-networks":
+            self._net_cache[key] = name
             return name
         elif net_type == "generic-networks":
             if instance == -1:
                 self._log.error("Invalid instance for _get_net: %d", instance)
                 raise ValueError
             # Generate full name for the generic network
-            net_name = name + "-GENERIC-" + pad(instance)
-            if net_name not in self.net_table:
-                exists = self.server.get_network(net_name)
-                if exists is not None:
+            net_name = f"{name}-GENERIC-{pad(instance)}"
+            if net_name in self.net_table:  # Already known to exist
+                self._net_cache[key] = net_name
+                return net_name
+
+            # Reading the host's name is a server call, so only do it
+            # when the messages are actually going to be logged
+            debug = self._log.isEnabledFor(logging.DEBUG)
+            # Every network that existed at init was fetched then, so a
+            # miss in that cache means the network doesn't exist, and the
+            # server doesn't have to be searched for it
+            if net_name.lower() in self._network_cache:
+                if debug:
                     self._log.debug("PortGroup '%s' already exists "
                                     "on host '%s'", net_name,
                                     self.host.name)
-                else:  # Create the generic network if it does not exist
-                    # WARNING: lookup of name is case-sensitive!
-                    # This can (and has0 lead to bugs
+            else:  # Create the generic network if it does not exist
+                # WARNING: lookup of name is case-sensitive!
+                # This can (and has0 lead to bugs
+                if debug:
                     self._log.debug("Creating portgroup '%s' on host '%s'",
-                                    net_name,
-                                    self.host.name)
-                    vsw = self.networks["generic-networks"][name].get(
-                        "vswitch", self.vswitch_name)
-                    create_portgroup(name=net_name,
-                                     host=self.host,
-                                     promiscuous=False,
-                                     vlan=next(get_vlan()),
-                                     vswitch_name=vsw)
-
-                # Register the existence of the generic network
-                self.net_table[net_name] = True
+                                    net_name, self.host.name)
+                vsw = self._generic_vswitch.get(name, self.vswitch_name)
+                create_portgroup(name=net_name,
+                                 host=self.host,
+                                 promiscuous=False,
+                                 vlan=self._vlan_map[(name, instance)],
+                                 vswitch_name=vsw)
+
+            # Register the existence of the generic network
+            self.net_table.add(net_name)
+            self._net_cache[key] = net_name
             return net_name
         else:
             self._log.error("Invalid network type %s for network %s",
@@ -706,22 +1037,59 @@ class VsphereInterface(Interface):
         :param bool network_cleanup: If networks should be cleaned up
         """
         # Get the folder to cleanup in
-        master_folder = self.root_folder.find_in(self.master_root_name)
+        master_folder = self._get_master_folder()
+        if master_folder is None:
+            self._log.error("Could not find Master folder '%s' to cleanup",
+                            self.master_root_name)
+            return
         self._log.info("Found master folder '%s' under folder '%s', "
                        "proceeding with cleanup...",
                        master_folder.name, self.root_folder.name)
 
-        # Recursively descend from master folder,
-        # destroying anything with the prefix
-        master_folder.cleanup(vm_prefix=self.master_prefix,
-                              recursive=True,
-                              destroy_folders=True,
-                              destroy_self=True)
+        # Retrieve every VM under the master folder in a single call,
+        # instead of reading the properties of each VM individually
+        vms = self.server.get_properties(master_folder, [vim.VirtualMachine],
+                                         ["name", "parent",
+                                          "runtime.powerState"])
+
+        # Destroy the Masters directly in the master folder, and anything
+        # in its sub-folders (which are destroyed along with the folder)
+        targets = [vm for vm, props in vms.items()
+                   if props.get("parent") != master_folder or
+                   props.get("name", "").startswith(self.master_prefix)]
+        powered_on = [vm for vm in targets
+                      if vms[vm].get("runtime.powerState") ==
+                      vim.VirtualMachine.PowerState.poweredOn]
+        self._log.debug("Destroying %d VMs (%d powered on)",
+                        len(targets), len(powered_on))
+
+        # Issue all the tasks at once so vSphere runs them concurrently,
+        # then wait for the whole batch to finish
+        self._wait_for_tasks([vm.PowerOffVM_Task() for vm in powered_on])
+        self._wait_for_tasks([vm.Destroy_Task() for vm in targets])
+
+        # Note: UnregisterAndDestroy does NOT delete VM files off the
+        # datastore, which is why the VMs are destroyed above first
+        self._log.debug("Destroying folder: '%s'", master_folder.name)
+        master_folder.UnregisterAndDestroy_Task().wait()
+        self.master_folder = None  # The cached folder no longer exists
 
         # Cleanup networks
         if network_cleanup:
             pass
 
+    def _wait_for_tasks(self, tasks):
+        """
+        Waits for a batch of vSphere tasks to complete.
+
+        :param tasks: Tasks to wait on
+        :type tasks: list(vim.Task)
+        """
+        if not tasks:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_parallel_clones) as pool:
+            list(pool.map(lambda task: task.wait(), tasks))
+
     def cleanup_environment(self, network_cleanup=False):
         """
         Cleans up a deployed environment.
@@ -736,10 +1104,24 @@ class VsphereInterface(Interface):
             pass
 
     def __str__(self):
-        return str(self.server) + str(self.groups) + str(self.hosts)
+        # The server, groups and hosts are fixed once initialized, and
+        # the server's description is fetched from the server itself
+        if self._str_cache is None:
+            self._str_cache = "".join((str(self.server), str(self.groups),
+                                       str(self.hosts)))
+        return self._str_cache
+
+    def __hash__(self):
+        # Hash cheap identifying fields instead of building str(self)
+        return hash((self.server, self.root_name))
 
     def __eq__(self, other):
-        return super(self.__class__, self).__eq__(other) and \
+        if self is other:
+            return True
+        # Compare the cheap fields before the full specifications
+        return isinstance(other, VsphereInterface) and \
             self.server == other.server and \
+            self.root_name == other.root_name and \
+            super(VsphereInterface, self).__eq__(other) and \
             self.groups == other.groups and \
             self.hosts == other.hosts
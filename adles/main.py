@@ -6,7 +6,7 @@ from os.path import basename, exists, join, splitext
 
 from adles.args import parse_cli_args
 from adles.interfaces import PlatformInterface
-from adles.parser import check_syntax, parse_yaml
+from adles.parser import check_syntax, parse_yaml, verify_infra_syntax
 from adles.utils import handle_keyboard_interrupt, setup_logging
 
 
@@ -65,6 +65,16 @@ def main(args) -> int:
                 logging.error("Could not find infra file '%s' "
                               "to override with", infra_file)
             else:
+                # Unlike the infra file named in the specification,
+                # an override file hasn't been checked by check_syntax()
+                infra = parse_yaml(infra_file)
+                if infra is None:
+                    return 1
+                errors, _ = verify_infra_syntax(infra)
+                if errors:
+                    logging.error("Override infra file '%s' has %d errors",
+                                  infra_file, errors)
+                    return 1
                 override = infra_file
 
         if override is not None:  # Override infra file in exercise config
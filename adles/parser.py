@@ -353,6 +353,22 @@ def _verify_folders_syntax(folders: dict) -> Tuple[int, int]:
     return num_errors, num_warnings
 
 
+def normalize_folders(folders: dict) -> None:
+    """Converts the "enabled" flags in a folder tree to booleans, in place.
+    Strings such as "false" would otherwise be treated as enabled.
+
+    :param folders: folders"""
+    keywords = ["group", "master-group", "instances", "description",
+                "enabled", "services"]
+    pending = [folders]
+    while pending:
+        folder = pending.pop()
+        if "enabled" in folder:
+            folder["enabled"] = utils.str_to_bool(folder["enabled"])
+        pending.extend(value for key, value in folder.items()
+                       if key not in keywords and isinstance(value, dict))
+
+
 def _verify_scoring_syntax(service_name: str, scoring: dict) -> Tuple[int, int]:
     """Verifies syntax for the scoring definition of a service.
 
@@ -397,6 +413,12 @@ def verify_infra_syntax(infra: dict) -> Tuple[int, int]:
             if "thresholds" in config:
                 num_errors += _checker(["folder", "service"], "infrastructure",
                                        config["thresholds"], "errors")
+            for field in ["max-parallel-clones", "max-clones-per-host"]:
+                if field in config and (not isinstance(config[field], int)
+                                        or config[field] < 1):
+                    logging.error("Invalid vSphere %s: %s (must be a "
+                                  "positive integer)", field, config[field])
+                    num_errors += 1
         elif platform == "docker":  # Docker configurations
             warnings = ["url"]
             errors = []
@@ -511,6 +533,9 @@ def check_syntax(specfile_path: str,
                       str(spec_type))
         return None
 
+    if errors == 0 and spec_type == "exercise":
+        normalize_folders(spec["folders"])
+
     if errors == 0 and warnings == 0:
         logging.info("Syntax check successful!")
         return spec
@@ -4,7 +4,7 @@ import logging.handlers
 import os
 import sys
 import timeit
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
 
 try:
     import tqdm
@@ -209,14 +209,26 @@ def setup_logging(filename: str, colors: bool = True,
                      "Proceed at your own risk!")
 
 
-def get_vlan() -> int:
-    """Generates a globally unique VLAN tags.
+def get_vlan() -> Iterator[int]:
+    """Generates globally unique VLAN tags.
+    Create the generator once and call next() on it for each tag.
 
-    :return: VLAN tag"""
+    :return: VLAN tags"""
     for i in range(2000, 4096):
         yield i
 
 
+def str_to_bool(value: object) -> bool:
+    """Interprets a configuration value as a boolean.
+    Strings such as "false" or "no" are False, instead of truthy.
+
+    :param value: Value to interpret
+    :return: The boolean value"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
 @handle_keyboard_interrupt
 def user_input(prompt: str, obj_name: str, func: Callable) -> Tuple[object, str]:
     """Continually prompts a user for input until the specified object is found.
@@ -1,4 +1,5 @@
 import logging
+from collections import deque
 
 from pyVmomi import vim
 
@@ -53,30 +54,40 @@ def cleanup(folder, vm_prefix='', folder_prefix='', recursive=False,
     :param bool destroy_folders: Destroy folders in addition to VMs
     :param bool destroy_self: Destroy the folder specified
     """
-    logging.debug("Cleaning folder '%s'", folder.name)
     from adles.vsphere.vm import VM
 
+    # Walk the folder tree breadth-first instead of recursing. Each entry is
+    # (folder, vm_prefix, folder_prefix, recursive, destroy_folders)
+    queue = deque([(folder, vm_prefix, folder_prefix,
+                    recursive, destroy_folders)])
+    to_destroy = [folder] if destroy_self else []
+
     # TODO: progress bar
     # pbar = tqdm.tqdm(folder.childEntity, desc="Cleaning folder",
     #                  unit="Items", clear=True)
-    for item in folder.childEntity:
-        # Handle VMs
-        if is_vm(item) and str(item.name).startswith(vm_prefix):
-            VM(vm=item).destroy()  # Delete the VM from the Datastore
-
-        # Handle folders
-        elif is_folder(item) and str(item.name).startswith(folder_prefix):
-            if destroy_folders:  # Destroys folder and ALL of it's sub-objects
-                cleanup(item, destroy_folders=True, destroy_self=True)
-            elif recursive:  # Simply recurses to find more items
-                cleanup(item, vm_prefix=vm_prefix,
-                        folder_prefix=folder_prefix, recursive=True)
+    while queue:
+        current, vm_prefix, folder_prefix, recursive, destroy_folders = \
+            queue.popleft()
+        logging.debug("Cleaning folder '%s'", current.name)
+        for item in current.childEntity:
+            # Handle VMs
+            if is_vm(item) and str(item.name).startswith(vm_prefix):
+                VM(vm=item).destroy()  # Delete the VM from the Datastore
+
+            # Handle folders
+            elif is_folder(item) and str(item.name).startswith(folder_prefix):
+                if destroy_folders:  # Destroys folder and ALL of it's sub-objects
+                    queue.append((item, '', '', False, True))
+                    to_destroy.append(item)
+                elif recursive:  # Simply descend to find more items
+                    queue.append((item, vm_prefix, folder_prefix, True, False))
 
     # Note: UnregisterAndDestroy does NOT delete VM files off the datastore
     # Only use if folder is already empty!
-    if destroy_self:
-        logging.debug("Destroying folder: '%s'", folder.name)
-        folder.UnregisterAndDestroy_Task().wait()
+    # Folders are destroyed deepest first, after all their VMs are gone
+    for item in reversed(to_destroy):
+        logging.debug("Destroying folder: '%s'", item.name)
+        item.UnregisterAndDestroy_Task().wait()
 
 
 def get_in_folder(folder, name, recursive=False, vimtype=None):
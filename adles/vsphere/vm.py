@@ -4,7 +4,6 @@ import os
 from pyVmomi import vim
 
 from adles import utils
-from adles.vsphere.folder_utils import find_in_folder
 
 
 # Docs: https://goo.gl/CRhYEX
@@ -51,7 +50,7 @@ class VM:
 
     def create(self, template=None, cpus=None, cores=None, memory=None,
                max_consoles=None, version=None, firmware='efi',
-               datastore_path=None):
+               datastore_path=None, clone_spec=None):
         """Creates a Virtual Machine.
         :param vim.VirtualMachine template: Template VM to clone
         :param int cpus: Number of processors
@@ -62,17 +61,24 @@ class VM:
         [default: highest host supports]
         :param str firmware: Firmware to emulate for the VM (efi | bios)
         :param str datastore_path: Path to existing VM files on datastore
+        :param vim.vm.CloneSpec clone_spec: Specification to clone the
+        template with [default: clone into the VM's pool and datastore]
         :return: If the creation was successful
         :rtype: bool
         """
+        # The result of the clone and create tasks is the new VM,
+        # so there's no need to search the folder for it afterwards
         if template is not None:  # Use a template to create the VM
             self._log.debug("Creating VM '%s' by cloning %s",
                             self.name, template.name)
-            clonespec = vim.vm.CloneSpec()
-            clonespec.location = vim.vm.RelocateSpec(pool=self.resource_pool,
-                                                     datastore=self.datastore)
-            if not template.CloneVM_Task(folder=self.folder, name=self.name,
-                                         spec=clonespec).wait(120):
+            clonespec = clone_spec
+            if clonespec is None:
+                clonespec = vim.vm.CloneSpec()
+                clonespec.location = vim.vm.RelocateSpec(
+                    pool=self.resource_pool, datastore=self.datastore)
+            self._vm = template.CloneVM_Task(folder=self.folder, name=self.name,
+                                             spec=clonespec).wait(120)
+            if not self._vm:
                 self._log.error("Error cloning VM %s", self.name)
                 return False
         else:  # Generate the specification for and create the new VM
@@ -96,16 +102,12 @@ class VM:
             spec.files = vim.vm.FileInfo(vmPathName=vm_path)
             self._log.debug("Creating VM '%s' in folder '%s'",
                             self.name, self.folder.name)
-            if not self.folder.CreateVM_Task(spec, self.resource_pool,
-                                             self.host).wait():
+            self._vm = self.folder.CreateVM_Task(spec, self.resource_pool,
+                                                 self.host).wait()
+            if not self._vm:
                 self._log.error("Error creating VM %s", self.name)
                 return False
 
-        self._vm = find_in_folder(self.folder, self.name,
-                                  vimtype=vim.VirtualMachine)
-        if not self._vm:
-            self._log.error("Failed to make VM %s", self.name)
-            return False
         self.network = self._vm.network
         self.runtime = self._vm.runtime
         self.summary = self._vm.summary
@@ -342,7 +344,6 @@ class VM:
         self._log.info("Removing ALL snapshots for %s", self.name)
         self._vm.RemoveAllSnapshots_Task(consolidate_disks).wait()
 
-    # Based on: add_nic_to_vm in pyvmomi-community-samples
     def add_nic(self, network, summary="default-summary", model="e1000"):
         """Add a NIC in the portgroup to the VM.
         :param vim.Network network: Network to attach NIC to
@@ -358,60 +359,10 @@ class VM:
         `Read this for more details:
         <http://rickardnobel.se/vmxnet3-vs-e1000e-and-e1000-part-1/>`_
         """
-        if not isinstance(network, vim.Network):
-            self._log.error("Invalid network type when adding vNIC "
-                            "to VM '%s': %s", self.name, type(network).__name__)
         self._log.debug("Adding NIC to VM '%s'\nNetwork: '%s'"
                         "\tSummary: '%s'\tNIC Model: '%s'",
                         self.name, network.name, summary, model)
-
-        # Create base object to add configurations to
-        spec = vim.vm.device.VirtualDeviceSpec()
-        spec.operation = vim.vm.device.VirtualDeviceSpec.Operation.add
-
-        # Set the type of network adapter
-        if model == "e1000":
-            spec.device = vim.vm.device.VirtualE1000()
-        elif model == "e1000e":
-            spec.device = vim.vm.device.VirtualE1000e()
-        elif model == "vmxnet":
-            spec.device = vim.vm.device.VirtualVmxnet()
-        elif model == "vmxnet2":
-            spec.device = vim.vm.device.VirtualVmxnet2()
-        elif model == "vmxnet3":
-            spec.device = vim.vm.device.VirtualVmxnet3()
-        elif model == "pcnet32":
-            spec.device = vim.vm.device.VirtualPCNet32()
-        elif model == "sriov":
-            spec.device = vim.vm.device.VirtualSriovEthernetCard()
-        else:
-            self._log.error("Invalid NIC model: '%s'\n"
-                            "Defaulting to e1000...", model)
-            spec.device = vim.vm.device.VirtualE1000()
-
-        # Sets how MAC address is assigned
-        spec.device.addressType = 'generated'
-        # Disables Wake-on-lan capabilities
-        spec.device.wakeOnLanEnabled = False
-
-        spec.device.deviceInfo = vim.Description()
-        spec.device.deviceInfo.summary = summary
-
-        spec.device.backing = \
-            vim.vm.device.VirtualEthernetCard.NetworkBackingInfo()
-        spec.device.backing.useAutoDetect = False
-        # Sets port group to assign adapter to
-        spec.device.backing.network = network
-        # Sets name of device on host system
-        spec.device.backing.deviceName = network.name
-
-        spec.device.connectable = vim.vm.device.VirtualDevice.ConnectInfo()
-        # Ensures adapter is connected at boot
-        spec.device.connectable.startConnected = True
-        # Allows guest OS to control device
-        spec.device.connectable.allowGuestControl = True
-        spec.device.connectable.connected = True
-        spec.device.connectable.status = 'untried'
+        spec = nic_add_spec(network=network, summary=summary, model=model)
         self._edit(vim.vm.ConfigSpec(deviceChange=[spec]))  # Apply change to VM
 
     def edit_nic(self, nic_id, network=None, summary=None):
@@ -429,21 +380,13 @@ class VM:
         if not virtual_nic_device:
             self._log.error('Virtual %s could not be found!', nic_label)
             return False
-        nic_spec = vim.vm.device.VirtualDeviceSpec()
-        nic_spec.operation = vim.vm.device.VirtualDeviceSpec.Operation.edit
-        nic_spec.device = virtual_nic_device
-        if summary:
-            nic_spec.device.deviceInfo.summary = str(summary)
-        if network:
-            self._log.debug("Changing PortGroup to: '%s'", network.name)
-            nic_spec.device.backing.network = network
-            nic_spec.device.backing.deviceName = network.name
+        nic_spec = nic_edit_spec(virtual_nic_device,
+                                 network=network, summary=summary)
 
         # Apply change to VM
         self._edit(vim.vm.ConfigSpec(deviceChange=[nic_spec]))
         return True
 
-    # Based on: delete_nic_from_vm in pyvmomi-community-samples
     def remove_nic(self, nic_number):
         """Deletes a vNIC based on it's number.
         :param int nic_number: Number of the vNIC to delete
@@ -454,19 +397,33 @@ class VM:
         self._log.debug("Removing Virtual %s from '%s'", nic_label, self.name)
         virtual_nic_device = self.get_nic_by_name(nic_label)
         if virtual_nic_device is not None:
-            virtual_nic_spec = vim.vm.device.VirtualDeviceSpec()
-            virtual_nic_spec.operation = \
-                vim.vm.device.VirtualDeviceSpec.Operation.remove
-            virtual_nic_spec.device = virtual_nic_device
-
             # Apply change to VM
-            self._edit(vim.vm.ConfigSpec(deviceChange=[virtual_nic_spec]))
+            self._edit(vim.vm.ConfigSpec(
+                deviceChange=[nic_remove_spec(virtual_nic_device)]))
             return True
         else:
             self._log.error("Virtual %s could not be found for '%s'",
                             nic_label, self.name)
             return False
 
+    def reconfig_nics(self, specs):
+        """Applies multiple vNIC changes in a single reconfiguration of the VM.
+        :param specs: vNIC changes to apply, e.g. from :func:`nic_add_spec`,
+        :func:`nic_edit_spec` and :func:`nic_remove_spec`
+        :type specs: list(vim.vm.device.VirtualDeviceSpec)
+        :return: If the reconfiguration was successful
+        :rtype: bool
+        """
+        self._log.debug("Applying %d vNIC changes to VM '%s'",
+                        len(specs), self.name)
+        # Devices added in the same reconfiguration
+        # need unique (negative) temporary keys
+        adds = [spec for spec in specs if spec.operation ==
+                vim.vm.device.VirtualDeviceSpec.Operation.add]
+        for key, spec in enumerate(adds, start=1):
+            spec.device.key = -key
+        return self._edit(vim.vm.ConfigSpec(deviceChange=specs))
+
     def remove_device(self, device_spec):
         """Removes a device from the VM.
         :param device_spec: The specification of the device to remove
@@ -925,3 +882,106 @@ def is_vnic(device):
     :rtype: bool
     """
     return isinstance(device, vim.vm.device.VirtualEthernetCard)
+
+
+# Based on: add_nic_to_vm in pyvmomi-community-samples
+def nic_add_spec(network, summary="default-summary", model="e1000"):
+    """Creates the specification to add a vNIC in the portgroup to a VM.
+    :param vim.Network network: Network to attach NIC to
+    :param str summary: Human-readable device info
+    [default: default-summary]
+    :param str model: Model of virtual network adapter.
+    Options: (e1000 | e1000e | vmxnet | vmxnet2
+    | vmxnet3 | pcnet32 | sriov)
+    :return: The device specification
+    :rtype: vim.vm.device.VirtualDeviceSpec
+    """
+    if not isinstance(network, vim.Network):
+        logging.error("Invalid network type when adding vNIC: %s",
+                      type(network).__name__)
+
+    # Create base object to add configurations to
+    spec = vim.vm.device.VirtualDeviceSpec()
+    spec.operation = vim.vm.device.VirtualDeviceSpec.Operation.add
+
+    # Set the type of network adapter
+    if model == "e1000":
+        spec.device = vim.vm.device.VirtualE1000()
+    elif model == "e1000e":
+        spec.device = vim.vm.device.VirtualE1000e()
+    elif model == "vmxnet":
+        spec.device = vim.vm.device.VirtualVmxnet()
+    elif model == "vmxnet2":
+        spec.device = vim.vm.device.VirtualVmxnet2()
+    elif model == "vmxnet3":
+        spec.device = vim.vm.device.VirtualVmxnet3()
+    elif model == "pcnet32":
+        spec.device = vim.vm.device.VirtualPCNet32()
+    elif model == "sriov":
+        spec.device = vim.vm.device.VirtualSriovEthernetCard()
+    else:
+        logging.error("Invalid NIC model: '%s'\n"
+                      "Defaulting to e1000...", model)
+        spec.device = vim.vm.device.VirtualE1000()
+
+    # Sets how MAC address is assigned
+    spec.device.addressType = 'generated'
+    # Disables Wake-on-lan capabilities
+    spec.device.wakeOnLanEnabled = False
+
+    spec.device.deviceInfo = vim.Description()
+    spec.device.deviceInfo.summary = summary
+
+    spec.device.backing = \
+        vim.vm.device.VirtualEthernetCard.NetworkBackingInfo()
+    spec.device.backing.useAutoDetect = False
+    # Sets port group to assign adapter to
+    spec.device.backing.network = network
+    # Sets name of device on host system
+    spec.device.backing.deviceName = network.name
+
+    spec.device.connectable = vim.vm.device.VirtualDevice.ConnectInfo()
+    # Ensures adapter is connected at boot
+    spec.device.connectable.startConnected = True
+    # Allows guest OS to control device
+    spec.device.connectable.allowGuestControl = True
+    spec.device.connectable.connected = True
+    spec.device.connectable.status = 'untried'
+    return spec
+
+
+def nic_edit_spec(device, network=None, summary=None):
+    """Creates the specification to edit a vNIC.
+    :param device: The vNIC to edit
+    :type device: vim.vm.device.VirtualEthernetCard
+    :param network: Network to assign the vNIC to
+    :type network: vim.Network
+    :param str summary: Human-readable device description
+    :return: The device specification
+    :rtype: vim.vm.device.VirtualDeviceSpec
+    """
+    spec = vim.vm.device.VirtualDeviceSpec()
+    spec.operation = vim.vm.device.VirtualDeviceSpec.Operation.edit
+    spec.device = device
+    if summary:
+        spec.device.deviceInfo.summary = str(summary)
+    if network:
+        logging.debug("Changing PortGroup of '%s' to: '%s'",
+                      device.deviceInfo.label, network.name)
+        spec.device.backing.network = network
+        spec.device.backing.deviceName = network.name
+    return spec
+
+
+# Based on: delete_nic_from_vm in pyvmomi-community-samples
+def nic_remove_spec(device):
+    """Creates the specification to remove a vNIC.
+    :param device: The vNIC to remove
+    :type device: vim.vm.device.VirtualEthernetCard
+    :return: The device specification
+    :rtype: vim.vm.device.VirtualDeviceSpec
+    """
+    spec = vim.vm.device.VirtualDeviceSpec()
+    spec.operation = vim.vm.device.VirtualDeviceSpec.Operation.remove
+    spec.device = device
+    return spec
@@ -326,6 +326,21 @@ class Vsphere(object):
         """
         return self.get_item(vim.HostSystem, host_name)
 
+    def get_hosts(self, host_names):
+        """
+        Finds and returns multiple named Host Systems.
+        Hosts are looked up in a single call to the server.
+
+        :param list(str) host_names: Names of the hosts
+        :return: The hosts found, in the same order as the names
+        :rtype: list(vim.HostSystem or None)
+        """
+        hosts = self.get_properties(self.content.rootFolder,
+                                    [vim.HostSystem], ["name"])
+        by_name = {props["name"].lower(): host
+                   for host, props in hosts.items()}
+        return [by_name.get(name.lower()) for name in host_names]
+
     def get_cluster(self, cluster_name=None):
         """
         Finds and returns the named Cluster.
@@ -420,6 +435,41 @@ class Vsphere(object):
         con_view.Destroy()
         return objs
 
+    # Based on: vim.PropertyCollector usage in pyvmomi-community-samples
+    def get_properties(self, container, vimtypes, properties, recursive=True):
+        """
+        Retrieves properties of all objects of the given types in a container
+        using a single PropertyCollector call, instead of a round-trip to
+        the server for every property access on every object.
+
+        :param container: Container to search in
+        :param list vimtypes: vimtype objects to look for
+        :param list(str) properties: Property paths to retrieve
+        (These must be valid for all of the vimtypes)
+        :param bool recursive: Recursively search for the objects
+        :return: Retrieved properties for each object found.
+        Properties that are unset on an object are omitted.
+        :rtype: dict(vimtype, dict(str, object))
+        """
+        con_view = self.content.viewManager.CreateContainerView(container,
+                                                                vimtypes,
+                                                                recursive)
+        collector = vmodl.query.PropertyCollector
+        traversal = collector.TraversalSpec(name="traverseEntities",
+                                            path="view", skip=False,
+                                            type=vim.view.ContainerView)
+        obj_spec = collector.ObjectSpec(obj=con_view, skip=True,
+                                        selectSet=[traversal])
+        prop_specs = [collector.PropertySpec(type=t, pathSet=properties)
+                      for t in vimtypes]
+        filter_spec = collector.FilterSpec(objectSet=[obj_spec],
+                                           propSet=prop_specs)
+        contents = self.content.propertyCollector.RetrieveContents(
+            [filter_spec])
+        con_view.Destroy()
+        return {obj.obj: {prop.name: prop.val for prop in obj.propSet}
+                for obj in contents}
+
     def get_item(self, vimtype, name=None, container=None, recursive=True):
         """
         Get a item of specified name and type.
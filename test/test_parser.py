@@ -0,0 +1,26 @@
+
+def test_normalize_folders():
+    from adles.parser import normalize_folders
+
+    folders = {
+        "enabled": "yes",
+        "parent": {
+            "enabled": "false",
+            "instances": {"enabled": "false"},
+            "base": {
+                "enabled": "off",
+                "group": "group",
+                "services": {"svc": {"service": "svc", "enabled": "false"}},
+            },
+        },
+        "other": {"services": {}},
+    }
+    normalize_folders(folders)
+
+    assert folders["enabled"] is True
+    assert folders["parent"]["enabled"] is False
+    assert folders["parent"]["base"]["enabled"] is False
+    assert "enabled" not in folders["other"]
+    # Keyword blocks and service configurations aren't folders
+    assert folders["parent"]["instances"]["enabled"] == "false"
+    assert folders["parent"]["base"]["services"]["svc"]["enabled"] == "false"
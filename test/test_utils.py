@@ -34,11 +34,26 @@ def test_split_path():
 
 
 def test_get_vlan():
-    # from adles.utils import get_vlan
-    # todo: fix "'>=' not supported between instances of 'generator' and 'int"
-    # assert get_vlan() >= 2000
-    # assert get_vlan() <= 4096
-    pass
+    from adles.utils import get_vlan
+
+    vlans = get_vlan()
+    assert next(vlans) == 2000
+    assert next(vlans) == 2001
+    assert len(list(vlans)) == 4096 - 2002
+
+
+def test_str_to_bool():
+    from adles.utils import str_to_bool
+
+    assert str_to_bool(True) is True
+    assert str_to_bool(False) is False
+    assert str_to_bool(0) is False
+    assert str_to_bool(1) is True
+    assert str_to_bool("true") is True
+    assert str_to_bool(" Yes ") is True
+    assert str_to_bool("false") is False
+    assert str_to_bool("off") is False
+    assert str_to_bool("") is False
 
 
 def test_read_json():